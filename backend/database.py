@@ -12,6 +12,17 @@ async def connect_to_mongo():
     client = AsyncIOMotorClient(settings.mongo_uri)
     db = client[settings.database_name]
     print(f"Connected to MongoDB: {settings.database_name}")
+    await ensure_indexes()
+
+
+async def ensure_indexes():
+    """
+    Index the per-document collections on document_id, which every graph,
+    chat and verification query filters on. create_index is a no-op when
+    the index already exists.
+    """
+    for collection in (db.concepts, db.relationships, db.chunks):
+        await collection.create_index("document_id")
 
 
 async def close_mongo_connection():
@@ -221,9 +221,9 @@ async def upload_pdf(
         {"$set": {"processed": True}}
     )
 
-    # Generate title for chat - with fallback
+    # Use the title produced by the analysis call; only generate one if missing
     try:
-        chat_title = generate_chat_title(raw_text)
+        chat_title = analysis.get("title") or generate_chat_title(raw_text)
         if not chat_title or not chat_title.strip():
             chat_title = doc_data["title"]
     except Exception as e:
@@ -348,9 +348,9 @@ async def paste_text(
         {"$set": {"processed": True}}
     )
 
-    # Generate title for chat - with fallback
+    # Use the title produced by the analysis call; only generate one if missing
     try:
-        chat_title = generate_chat_title(text)
+        chat_title = analysis.get("title") or generate_chat_title(text)
         if not chat_title or not chat_title.strip():
             chat_title = "Learn: " + text[:50].replace('\n', ' ')
     except Exception as e:
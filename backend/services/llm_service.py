@@ -3,19 +3,138 @@ LLM Service for analyzing text and extracting causal relationships.
 Uses Groq API for high-performance inference.
 """
 
-import json
 import os
+import threading
 from typing import Dict, Any, List
-from groq import Groq, RateLimitError
+import orjson
+from groq import Groq, RateLimitError, APIConnectionError, APITimeoutError, APIStatusError
 from config import get_settings
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import (
+    retry, stop_after_attempt, stop_after_delay, wait_fixed, wait_random_exponential,
+    retry_if_exception, retry_if_exception_type
+)
 
 settings = get_settings()
 
-# Initialize Groq client
-client = None
-if settings.groq_api_key:
-    client = Groq(api_key=settings.groq_api_key)
+# Read once at import; the key does not change for the life of the process
+_GROQ_KEY = settings.groq_api_key
+
+# Per-request timeout (seconds). The SDK's own retries are disabled so that
+# _create_completion's tenacity policy is the only retry layer.
+_REQUEST_TIMEOUT = 30.0
+
+# Shared Groq client, created lazily by _get_client()
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """
+    Return the shared Groq client, or None when no API key is configured.
+    Uses double-checked locking so concurrent first requests cannot create
+    duplicate clients (each with its own connection pool).
+    """
+    global _client
+    if _client is None and _GROQ_KEY:
+        with _client_lock:
+            if _client is None:
+                _client = Groq(
+                    api_key=_GROQ_KEY,
+                    max_retries=0,
+                    timeout=_REQUEST_TIMEOUT
+                )
+    return _client
+
+
+def _is_server_error(exc: BaseException) -> bool:
+    """Return True for Groq 5xx responses, which are usually transient."""
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+# Retry rate limits, network blips, timeouts and 5xx responses instead of
+# falling back to the mock. Jittered backoff avoids synchronized retries,
+# and rate limits wait for Groq's retry-after when it sends one.
+# Retrying stops once _RETRY_BUDGET seconds have passed, so the worst case is
+# the budget plus one capped wait and one _REQUEST_TIMEOUT (45 + 15 + 30s),
+# inside gunicorn's 120s worker timeout.
+_RETRY_BUDGET = 45
+_MAX_RETRY_WAIT = 15
+
+_RETRY_TRANSIENT = (
+    retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError))
+    | retry_if_exception(_is_server_error)
+)
+
+# 2s floor plus jitter, at most 10s
+_backoff = wait_fixed(2) + wait_random_exponential(multiplier=1, max=8)
+
+
+def _retry_wait(retry_state) -> float:
+    """
+    Wait before the next attempt: at least Groq's retry-after for a 429
+    (capped at _MAX_RETRY_WAIT), otherwise jittered exponential backoff.
+    """
+    wait = _backoff(retry_state)
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, RateLimitError):
+        try:
+            retry_after = float(exc.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return wait
+        return min(max(wait, retry_after), _MAX_RETRY_WAIT)
+    return wait
+
+
+@retry(
+    retry=_RETRY_TRANSIENT,
+    wait=_retry_wait,
+    stop=stop_after_attempt(5) | stop_after_delay(_RETRY_BUDGET)
+)
+def _create_completion(client, **kwargs):
+    """Create a chat completion, retrying transient Groq errors."""
+    return client.chat.completions.create(**kwargs)
+
+
+# Model routing: small completions go to faster models, the large model is
+# reserved for causal extraction where output quality matters most.
+_MODEL_TIERS = {
+    "title": "llama-3.1-8b-instant",
+    "chat": "llama-3.3-70b-versatile",
+    "analyze": "openai/gpt-oss-120b",
+    "quiz": "llama-3.3-70b-versatile",
+    "flashcards": "llama-3.1-8b-instant",
+}
+
+
+def _canon_list(items: List[str]) -> List[str]:
+    """
+    Canonicalize a list of user-provided terms: strip, drop case-insensitive
+    duplicates and sort, so equivalent inputs produce identical prompts
+    (and hit the same Groq-side prompt cache) regardless of order.
+    """
+    unique = {}
+    for item in items:
+        item = item.strip()
+        if item:
+            unique.setdefault(item.lower(), item)
+    return [unique[key] for key in sorted(unique)]
+
+
+def _bounded_join(sentences: List[str], max_chars: int = 15000) -> str:
+    """
+    Join sentences with spaces, stopping as soon as the character budget is
+    exceeded so large documents are never fully concatenated just to be
+    truncated. Truncated output ends with "...".
+    """
+    parts = []
+    size = -1  # No separator before the first sentence
+    for sentence in sentences:
+        parts.append(sentence)
+        size += len(sentence) + 1
+        if size > max_chars:
+            return " ".join(parts)[:max_chars] + "..."
+    return " ".join(parts)
+
 
 SYSTEM_PROMPT = """
 You are an expert causal reasoning engine. Your task is to analyze the provided text and extract causal relationships between concepts.
@@ -45,8 +164,11 @@ If a concept is abstract (e.g., "Complexity", "Efficiency", "Security"), you MUS
 Example: "Java Garbage Collection" -> Unit: "Pause Time (ms)".
 Example: "Code Complexity" -> Unit: "Cyclomatic Score".
 
+Also include a top-level "title" field: a concise 3-5 word chat title without quotes.
+
 Output Schema:
 {
+    "title": "Concise 3-5 Word Title",
     "concepts": [
         {
             "id": "concept_id_snake_case",
@@ -94,8 +216,11 @@ Extraction Rules:
 4. Extract 15-30 concepts total, ensuring comprehensive coverage of the focus areas
 5. Every concept extracted should have a clear path connecting to at least one focus concept
 
+Also include a top-level "title" field: a concise 3-5 word chat title without quotes.
+
 Output Schema:
 {
+    "title": "Concise 3-5 Word Title",
     "concepts": [
         {
             "id": "concept_id_snake_case",
@@ -190,28 +315,21 @@ def analyze_text_with_llm(sentences: List[str], focus_concepts: List[str] = None
     Analyze text using Groq LLM to extract causal structure.
     If focus_concepts are provided, the extraction will be centered around those concepts.
     """
-    global client
-    if not client and settings.groq_api_key:
-        client = Groq(api_key=settings.groq_api_key)
-
-    if not client:
+    client = _get_client()
+    if client is None:
         print("Warning: Groq API key not found, falling back to mock")
         from services.mock_llm import analyze_text
         return analyze_text(sentences, focus_concepts)
 
-    # Combine sentences into text block
-    full_text = " ".join(sentences)
-
-    # Truncate if too long (rough token estimation)
-    if len(full_text) > 15000:
-        full_text = full_text[:15000] + "..."
+    # Combine sentences into text block, truncating if too long (rough token estimation)
+    full_text = _bounded_join(sentences)
 
-    model_name = "openai/gpt-oss-120b"  # Using a supported Groq model
+    model_name = _MODEL_TIERS["analyze"]
 
     # Choose prompt based on whether focus concepts are provided or if it's a topic request
     if focus_concepts and len(focus_concepts) > 0:
         system_prompt = FOCUSED_SYSTEM_PROMPT
-        focus_str = ", ".join(focus_concepts)
+        focus_str = ", ".join(_canon_list(focus_concepts))
         user_message = f"""FOCUS CONCEPTS (these are what the user wants to learn):
 {focus_str}
 
@@ -242,22 +360,10 @@ Return your response as a JSON object."""
     print(full_text[:500] + "..." if len(full_text) > 500 else full_text)
     print("-" * 96)
 
-    @retry(
-        retry=retry_if_exception_type(RateLimitError),
-        wait=wait_exponential(multiplier=1, min=4, max=60),
-        stop=stop_after_attempt(5)
-    )
-    def call_gemini_with_retry(messages, model, temperature, response_format):
-        print("Calling Groq API...")
-        return client.chat.completions.create(
-            messages=messages,
-            model=model,
-            temperature=temperature,
-            response_format=response_format
-        )
-
     try:
-        completion = call_gemini_with_retry(
+        print("Calling Groq API...")
+        completion = _create_completion(
+            client,
             messages=[
                 {
                     "role": "system",
@@ -282,8 +388,8 @@ Return your response as a JSON object."""
         print("-" * 100)
 
         try:
-            result = json.loads(response_content)
-        except json.JSONDecodeError as je:
+            result = orjson.loads(response_content)
+        except orjson.JSONDecodeError as je:
             print(f"JSON Parsing Error: {str(je)}")
             print(f"Invalid JSON Content: {response_content}")
             raise je
@@ -292,11 +398,15 @@ Return your response as a JSON object."""
         concepts = result.get("concepts", [])
         relationships = result.get("relationships", [])
         causal_sentences = result.get("causal_sentences", [])
+        # A missing or non-string title shouldn't discard the analysis
+        title = result.get("title")
+        title = title.strip().replace('"', '') if isinstance(title, str) else ""
 
         print(
             f"Extraction results: {len(concepts)} concepts, {len(relationships)} relationships")
 
         return {
+            "title": title,
             "concepts": concepts,
             "relationships": relationships,
             "causal_sentences": causal_sentences,
@@ -320,17 +430,14 @@ def generate_from_topics(topics: List[str]) -> Dict[str, Any]:
     Generate a knowledge graph from topics without any source document.
     Uses LLM's knowledge to create educational content.
     """
-    global client
-    if not client and settings.groq_api_key:
-        client = Groq(api_key=settings.groq_api_key)
-
-    if not client:
+    client = _get_client()
+    if client is None:
         print("Warning: Groq API key not found, falling back to mock")
         from services.mock_llm import generate_mock_topics
         return generate_mock_topics(topics)
 
-    model_name = "openai/gpt-oss-120b"
-    topics_str = ", ".join(topics)
+    model_name = _MODEL_TIERS["analyze"]
+    topics_str = ", ".join(_canon_list(topics))
 
     user_message = f"""Generate a comprehensive knowledge graph for learning about these topics:
 
@@ -347,14 +454,10 @@ Return your response as a valid JSON object following the schema in the system p
 
     print(f"Starting TOPIC GENERATION for: {topics_str}")
 
-    @retry(
-        retry=retry_if_exception_type(RateLimitError),
-        wait=wait_exponential(multiplier=1, min=4, max=60),
-        stop=stop_after_attempt(5)
-    )
-    def call_topic_gen_with_retry():
+    try:
         print("Calling Groq API for topic generation...")
-        return client.chat.completions.create(
+        completion = _create_completion(
+            client,
             messages=[
                 {
                     "role": "system",
@@ -370,9 +473,6 @@ Return your response as a valid JSON object following the schema in the system p
             response_format={"type": "json_object"}
         )
 
-    try:
-        completion = call_topic_gen_with_retry()
-
         response_content = completion.choices[0].message.content
         print(f"LLM Response received ({len(response_content)} chars)")
 
@@ -383,8 +483,8 @@ Return your response as a valid JSON object following the schema in the system p
         print("-" * 100)
 
         try:
-            result = json.loads(response_content)
-        except json.JSONDecodeError as je:
+            result = orjson.loads(response_content)
+        except orjson.JSONDecodeError as je:
             print(f"JSON Parsing Error: {str(je)}")
             print(f"Invalid JSON Content: {response_content}")
             raise je
@@ -420,11 +520,8 @@ def chat_with_context(context: str, message: str, history: List[Dict[str, str]]
     Chat with the LLM using provided context.
     Improved to handle abbreviations, spelling mistakes, and context understanding.
     """
-    global client
-    if not client and settings.groq_api_key:
-        client = Groq(api_key=settings.groq_api_key)
-
-    if not client:
+    client = _get_client()
+    if client is None:
         return "Error: AI service not available. Please check API key configuration."
 
     # Prepare messages with enhanced system prompt
@@ -460,27 +557,20 @@ Use the following context to answer the user's question:
     
     messages.append({"role": "user", "content": enhanced_message})
 
-    model_name = "openai/gpt-oss-120b"
+    model_name = _MODEL_TIERS["chat"]
 
     print(
         f"Starting Chat with context ({len(context)} chars) - Query: {message}")
 
-    @retry(
-        retry=retry_if_exception_type(RateLimitError),
-        wait=wait_exponential(multiplier=1, min=4, max=60),
-        stop=stop_after_attempt(5)
-    )
-    def call_chat_with_retry():
-        return client.chat.completions.create(
+    try:
+        completion = _create_completion(
+            client,
             messages=messages,
             model=model_name,
             temperature=0.7,
             max_tokens=1000
         )
 
-    try:
-        completion = call_chat_with_retry()
-
         response = completion.choices[0].message.content
         print(f"Chat Response: {response[:100]}...")
         return response
@@ -493,12 +583,11 @@ Use the following context to answer the user's question:
 def generate_chat_title(text_content: str) -> str:
     """
     Generate a short, concise 3-5 word title for a chat based on the document content or query.
+    The analysis prompts already return a "title" field, so this is only needed
+    when no analysis call produced one (e.g. the mock fallback).
     """
-    global client
-    if not client and settings.groq_api_key:
-        client = Groq(api_key=settings.groq_api_key)
-
-    if not client:
+    client = _get_client()
+    if client is None:
         return "New Chat"
 
     # Truncate content for title generation
@@ -516,7 +605,7 @@ def generate_chat_title(text_content: str) -> str:
                     "content": f"Text: {preview_text}"
                 }
             ],
-            model="openai/gpt-oss-120b",
+            model=_MODEL_TIERS["title"],
             temperature=0.5,
             max_tokens=20
         )
@@ -561,11 +650,8 @@ def generate_quiz(concept_label: str, context: str) -> Dict[str, Any]:
     """
     Generate a quiz for a specific concept using LLM knowledge + context.
     """
-    global client
-    if not client and settings.groq_api_key:
-        client = Groq(api_key=settings.groq_api_key)
-
-    if not client:
+    client = _get_client()
+    if client is None:
         # Fallback to mock if no client
         return {
             "questions": [
@@ -588,7 +674,8 @@ Remember to use your own knowledge to supplement this context and create a compr
     print(f"Starting Quiz Generation for: {concept_label}")
 
     try:
-        completion = client.chat.completions.create(
+        completion = _create_completion(
+            client,
             messages=[
                 {
                     "role": "system",
@@ -599,13 +686,13 @@ Remember to use your own knowledge to supplement this context and create a compr
                     "content": user_message
                 }
             ],
-            model="openai/gpt-oss-120b",
+            model=_MODEL_TIERS["quiz"],
             temperature=0.4,
             response_format={"type": "json_object"}
         )
 
         response_content = completion.choices[0].message.content
-        result = json.loads(response_content)
+        result = orjson.loads(response_content)
         return result
 
 
@@ -643,11 +730,8 @@ def generate_flashcards(concept_label: str, context: str) -> Dict[str, Any]:
     """
     Generate flashcards for a specific concept using LLM knowledge + context.
     """
-    global client
-    if not client and settings.groq_api_key:
-        client = Groq(api_key=settings.groq_api_key)
-
-    if not client:
+    client = _get_client()
+    if client is None:
         return {
             "cards": [
                 {"front": f"What is {concept_label}?", "back": f"This is a mock flashcard about {concept_label}."}
@@ -665,18 +749,19 @@ Return your response as a JSON object with a "cards" array."""
     print(f"Starting Flashcard Generation for: {concept_label}")
 
     try:
-        completion = client.chat.completions.create(
+        completion = _create_completion(
+            client,
             messages=[
                 {"role": "system", "content": FLASHCARD_GENERATION_PROMPT},
                 {"role": "user", "content": user_message}
             ],
-            model="openai/gpt-oss-120b",
+            model=_MODEL_TIERS["flashcards"],
             temperature=0.4,
             response_format={"type": "json_object"}
         )
 
         response_content = completion.choices[0].message.content
-        result = json.loads(response_content)
+        result = orjson.loads(response_content)
         return result
 
     except Exception as e:
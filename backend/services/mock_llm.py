@@ -7,8 +7,16 @@ for causal analysis. In production, this would call OpenAI/Groq APIs.
 The mock data covers common physics and economics concepts for demo purposes.
 """
 
+import ast
+import itertools
+import logging
+import math
+import operator
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
 
 # Pre-defined causal patterns and their concept mappings
 CAUSAL_PATTERNS = {
@@ -213,42 +221,169 @@ CAUSAL_PATTERNS.update({
         CAUSAL_PATTERNS[r"demand.*(?:increase|rise|higher).*price.*(?:increase|rise|higher)"],
 })
 
+# Compiled once at import and matched against the lowercased sentence.
+# Case-sensitive patterns keep re's literal-prefix scan, which IGNORECASE
+# disables, and separate searches beat a single alternation for the same
+# reason.
+_COMPILED_PATTERNS = [
+    (re.compile(pattern), data) for pattern, data in CAUSAL_PATTERNS.items()
+]
+
+# What analyze_text merges for each pattern, flattened once: ((concept id,
+# concept), ...), (source, target) and the relationship. The dicts are the
+# shared CAUSAL_PATTERNS objects, not copies.
+_PATTERN_MERGES = [
+    (
+        tuple((concept["id"], concept) for concept in data["concepts"]),
+        (data["relationship"]["source"], data["relationship"]["target"]),
+        data["relationship"],
+    )
+    for _, data in _COMPILED_PATTERNS
+]
+
+# Generic causal keywords, used when no specific pattern matches, as
+# (triggers, regex) pairs. The triggers are literals at least one of which
+# every match of the regex contains, so a few substring checks can skip the
+# regex entirely. Whole words share one \b-terminated group and common
+# prefixes/suffixes are factored (e.g. (?:de|in)creases?), so the combined
+# regex is one prefix-shared alternation scanned once per sentence.
+_CAUSAL_WORDS = (
+    (("increase", "decrease"), r"(?:de|in)creases?"),
+    (("cause",), r"causes?"),
+    (("affect",), r"affects?"),
+    (("because",), r"because"),
+    (("therefore",), r"therefore"),
+    (("consequently",), r"consequently"),
+    (("hence",), r"hence"),
+)
+_CAUSAL_PHRASES = (
+    (("lead",), r"leads?\s+to"),
+    (("result",), r"results?\s+in"),
+    (("then",), r"(?:when|if).*then"),
+)
+_CAUSAL_KEYWORDS_RE = re.compile(
+    "(?:" + "|".join(regex for _, regex in _CAUSAL_WORDS) + r")\b|"
+    + "|".join(regex for _, regex in _CAUSAL_PHRASES)
+)
+_KEYWORD_TRIGGERS = tuple(
+    trigger
+    for triggers, _ in _CAUSAL_WORDS + _CAUSAL_PHRASES
+    for trigger in triggers
+)
+
+# Tokens the required-token index below is keyed on
+_INDEX_TOKENS = ("pressure", "price", "heart")
+_GROUP_RE = re.compile(r"\([^()]*\)")
+
+
+def _required_token(pattern: str) -> str:
+    """
+    Return the first _INDEX_TOKENS entry that every match of the pattern
+    must contain, or "" if there is none or it can't be proven. Groups are
+    removed first, since a token inside an alternation is not required, and
+    a token followed by ?, * or { may be incomplete in a match. Escapes and
+    character classes could hide parentheses or quantifiers from this
+    check, so patterns using them are never indexed.
+    """
+    if "\\" in pattern or "[" in pattern:
+        return ""
+
+    outside_groups = pattern
+    while True:
+        stripped = _GROUP_RE.sub("", outside_groups)
+        if stripped == outside_groups:
+            break
+        outside_groups = stripped
+    if "|" in outside_groups:
+        return ""
+
+    for token in _INDEX_TOKENS:
+        start = outside_groups.find(token)
+        while start != -1:
+            end = start + len(token)
+            if outside_groups[end:end + 1] not in ("?", "*", "{"):
+                return token
+            start = outside_groups.find(token, start + 1)
+    return ""
+
+
+def _build_pattern_index() -> dict[str, tuple[int, ...]]:
+    """
+    Map each required token to the indices of the patterns that need it.
+    Patterns with no required token are keyed on "", which every sentence
+    contains, so they are always tried.
+    """
+    index: dict[str, list[int]] = {}
+    for i, (pattern, _) in enumerate(_COMPILED_PATTERNS):
+        index.setdefault(_required_token(pattern.pattern), []).append(i)
+    return {token: tuple(indices) for token, indices in index.items()}
+
+
+# Required-token index over CAUSAL_PATTERNS, derived at import so new
+# patterns are covered automatically. A few substring checks pick the only
+# patterns worth running, so sentences without any of the tokens skip
+# pattern matching entirely.
+_PATTERN_INDEX = _build_pattern_index()
+
+# Results of _match_sentence that are not a CAUSAL_PATTERNS index
+_NON_CAUSAL = -2
+_GENERIC_CAUSAL = -1
 
-def classify_sentence(sentence: str) -> dict:
+
+@lru_cache(maxsize=4096)
+def _match_sentence(sentence_lower: str) -> int:
     """
-    Classify a sentence as causal or non-causal.
-    Returns concepts and relationships if causal.
+    Return the index of the highest-priority pattern matching the lowercased
+    sentence, _GENERIC_CAUSAL if only a causal keyword matches, or _NON_CAUSAL.
+    Cached so repeated sentences (e.g. DEMO_TEXT) skip regex work; only the
+    integer is cached, never the mutable result dict.
     """
-    sentence_lower = sentence.lower()
-
-    # Check against known patterns
-    for pattern, data in CAUSAL_PATTERNS.items():
-        if re.search(pattern, sentence_lower):
-            return {
-                "is_causal": True,
-                "concepts": data["concepts"],
-                "relationship": data["relationship"],
-                "original_sentence": sentence
-            }
+    # Check candidate patterns (those whose required token is present), in priority order
+    candidates = [
+        index
+        for token, indices in _PATTERN_INDEX.items() if token in sentence_lower
+        for index in indices
+    ]
+    for index in sorted(candidates):
+        if _COMPILED_PATTERNS[index][0].search(sentence_lower):
+            return index
 
     # Check for generic causal keywords
-    causal_keywords = [
-        r"causes?\b", r"leads?\s+to", r"results?\s+in",
-        r"increases?\b", r"decreases?\b", r"affects?\b",
-        r"when.*then", r"if.*then", r"because\b",
-        r"therefore\b", r"consequently\b", r"hence\b"
-    ]
+    if (any(trigger in sentence_lower for trigger in _KEYWORD_TRIGGERS)
+            and _CAUSAL_KEYWORDS_RE.search(sentence_lower)):
+        return _GENERIC_CAUSAL
 
-    for keyword in causal_keywords:
-        if re.search(keyword, sentence_lower):
-            # Generic causal sentence detected but no specific pattern match
-            return {
-                "is_causal": True,
-                "concepts": None,  # Would need LLM to extract
-                "relationship": None,
-                "original_sentence": sentence,
-                "needs_llm": True
-            }
+    return _NON_CAUSAL
+
+
+def classify_sentence(sentence: str, sentence_lower: Optional[str] = None) -> dict:
+    """
+    Classify a sentence as causal or non-causal.
+    Returns concepts and relationships if causal.
+    Pass sentence_lower if the caller already lowercased the sentence.
+    """
+    if sentence_lower is None:
+        sentence_lower = sentence.lower()
+    index = _match_sentence(sentence_lower)
+
+    if index >= 0:
+        data = _COMPILED_PATTERNS[index][1]
+        return {
+            "is_causal": True,
+            "concepts": data["concepts"],
+            "relationship": data["relationship"],
+            "original_sentence": sentence
+        }
+
+    if index == _GENERIC_CAUSAL:
+        # Generic causal sentence detected but no specific pattern match
+        return {
+            "is_causal": True,
+            "concepts": None,  # Would need LLM to extract
+            "relationship": None,
+            "original_sentence": sentence,
+            "needs_llm": True
+        }
 
     return {
         "is_causal": False,
@@ -266,37 +401,34 @@ def analyze_text(sentences: list[str], focus_concepts: list[str] = None) -> dict
     """
     all_concepts = {}
     all_relationships = []
+    seen_rels = set()  # (source, target) pairs already in all_relationships
     causal_sentences = []
 
-    # Convert focus concepts to lowercase for matching
-    focus_lower = [c.lower() for c in focus_concepts] if focus_concepts else []
+    # Convert focus concepts to lowercase for matching, dropping duplicates so
+    # each distinct term is scanned for only once per sentence
+    focus_lower = tuple(dict.fromkeys(c.lower() for c in focus_concepts)) if focus_concepts else ()
 
     for sentence in sentences:
-        result = classify_sentence(sentence)
-
-        # If we have focus concepts, also check if the sentence mentions them
+        # Lowercase once for both pattern matching and the focus check, and
+        # use the cached pattern index directly rather than building a
+        # classify_sentence() result dict for every sentence
         sentence_lower = sentence.lower()
-        mentions_focus = any(
-            fc in sentence_lower for fc in focus_lower) if focus_lower else False
+        index = _match_sentence(sentence_lower)
 
-        if result["is_causal"] and result["concepts"]:
-            causal_sentences.append(result["original_sentence"])
+        if index >= 0:
+            concepts, rel_key, rel = _PATTERN_MERGES[index]
+            causal_sentences.append(sentence)
 
             # Merge concepts (avoid duplicates)
-            for concept in result["concepts"]:
-                concept_id = concept["id"]
+            for concept_id, concept in concepts:
                 if concept_id not in all_concepts:
                     all_concepts[concept_id] = concept
 
-            # Add relationship
-            if result["relationship"]:
-                rel = result["relationship"]
-                # Check for duplicate relationships
-                rel_key = f"{rel['source']}-{rel['target']}"
-                if not any(r["source"] == rel["source"] and r["target"] == rel["target"]
-                           for r in all_relationships):
-                    all_relationships.append(rel)
-        elif mentions_focus:
+            # Add relationship, skipping duplicates
+            if rel_key not in seen_rels:
+                seen_rels.add(rel_key)
+                all_relationships.append(rel)
+        elif focus_lower and any(fc in sentence_lower for fc in focus_lower):
             # Even if not traditionally causal, include if it mentions focus concepts
             causal_sentences.append(sentence)
 
@@ -310,6 +442,123 @@ def analyze_text(sentences: list[str], focus_concepts: list[str] = None) -> dict
     }
 
 
+# Functions and constants available to simulation equations
+_EQUATION_FUNCTIONS = {
+    "exp": math.exp,
+    "log": math.log,
+    "sqrt": math.sqrt,
+    "pow": math.pow,
+    "abs": abs,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+}
+_EQUATION_CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e
+}
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _build_equation(node: ast.AST) -> Callable[[float], float]:
+    """
+    Turn a whitelisted expression node into a closure over x.
+    Raises ValueError for any syntax outside simple arithmetic on x,
+    the constants and the functions above.
+    """
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda x: value
+
+    if isinstance(node, ast.Name):
+        if node.id == "x":
+            return lambda x: x
+        if node.id in _EQUATION_CONSTANTS:
+            value = _EQUATION_CONSTANTS[node.id]
+            return lambda x: value
+        raise ValueError(f"Unknown name '{node.id}'")
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left = _build_equation(node.left)
+        right = _build_equation(node.right)
+        return lambda x: op(left(x), right(x))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = _build_equation(node.operand)
+        return lambda x: op(operand(x))
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _EQUATION_FUNCTIONS and not node.keywords):
+        func = _EQUATION_FUNCTIONS[node.func.id]
+        args = [_build_equation(arg) for arg in node.args]
+        if len(args) == 1:
+            arg = args[0]
+            return lambda x: func(arg(x))
+        return lambda x: func(*[arg(x) for arg in args])
+
+    raise ValueError(f"Unsupported expression: {type(node).__name__}")
+
+
+# Characters allowed in the coefficients of a "m * x + b" equation; keeps
+# float() from accepting names like "inf" or "nan" that the AST path rejects
+_LINEAR_CHARS = frozenset("0123456789.+-e")
+
+
+def _fast_linear(eq_body: str) -> Optional[tuple[float, Optional[float]]]:
+    """
+    Parse the common "m * x + b" / "m * x" shape with string methods,
+    returning (m, b), with b None if absent, or None for any other shape.
+    """
+    parts = eq_body.replace(" ", "").split("*x")
+    if len(parts) != 2:
+        return None
+    slope, intercept = parts
+    if (not slope or not set(slope) <= _LINEAR_CHARS
+            or not set(intercept) <= _LINEAR_CHARS
+            or intercept[:1] not in ("", "+", "-")):
+        return None
+    try:
+        return float(slope), float(intercept) if intercept else None
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=512)
+def _compile_equation(equation: str) -> Callable[[float], float]:
+    """
+    Normalize and parse an equation ("y = expression(x)") once into a
+    callable of x, cached per equation string so repeated simulation
+    requests for a relationship skip parsing entirely.
+    """
+    # Remove "y =" prefix if present
+    eq_body = equation.lower().split("=")[-1].strip()
+
+    # Most equations are linear; evaluate those as one expression instead
+    # of a tree of closures
+    linear = _fast_linear(eq_body)
+    if linear is not None:
+        slope, intercept = linear
+        if intercept is None:
+            return lambda x: slope * x
+        return lambda x: slope * x + intercept
+
+    return _build_equation(ast.parse(eq_body, mode="eval").body)
+
+
 def calculate_simulation(
     input_value: float,
     relationship_type: str,
@@ -327,49 +576,97 @@ def calculate_simulation(
     # Format: y = expression(x)
     if equation:
         try:
-            import math
-            
-            # 1. Normalize equation
-            # Remove "y =" prefix if present
-            eq_body = getattr(equation, "lower", lambda: str(equation))().split("=")[-1].strip()
-            
-            # 2. Replace logical tokens with python math
-            # Replace 'x' with actual value
-            # Note: We prioritize 'exp' over 'x' to avoid replacing occurrences inside function names
-            safe_env = {
-                "x": input_value,
-                "exp": math.exp,
-                "log": math.log,
-                "sqrt": math.sqrt,
-                "pow": math.pow,
-                "abs": abs,
-                "sin": math.sin,
-                "cos": math.cos,
-                "tan": math.tan,
-                "pi": math.pi,
-                "e": math.e
-            }
-
-            # 3. Safe Evaluation
-            # We use eval() with a restricted environment. 
-            # In a real production system, consider using `simpleeval` or a parser library.
-            # Here we restrict access to __builtins__ for basic safety.
-            result = eval(eq_body, {"__builtins__": {}}, safe_env)
+            # Safe Evaluation
+            # The equation is parsed once per equation string into a
+            # closure; only arithmetic on x and the whitelisted math helpers
+            # are accepted, so no eval() is involved.
+            result = _compile_equation(str(equation))(input_value)
             
             if isinstance(result, (int, float)):
                 return float(result)
 
         except Exception as e:
             # Fallback for simple linear parsing if complex eval fails
-            print(f"Equation parsing failed for '{equation}': {str(e)}")
+            logger.warning("Equation parsing failed for %r: %s", equation, e)
 
     # Fallback to simple linear logic if no equation or parsing failed
-    delta = input_value - source_default
-    if relationship_type == "inverse":
-        return target_default - (coefficient * delta)
-    
-    # Default direct
-    return target_default + (coefficient * delta)
+    # (inverse relationships move the target opposite to the source)
+    sign = -1 if relationship_type == "inverse" else 1
+    return target_default + sign * coefficient * (input_value - source_default)
+
+
+# Maps the separators in a topic name to "_" in a single pass when building ids
+_ID_TRANS = str.maketrans({" ": "_", "-": "_"})
+
+# Sub-concept templates for generate_mock_topics as (id suffix, label suffix,
+# description); ids become "<topic_id>_<suffix>", labels "<topic> <suffix>".
+# Level 1: primary sub-concepts (direct children of a topic)
+_LEVEL1_TEMPLATES = (
+    ("fundamentals", "Fundamentals", "Core principles and foundational concepts"),
+    ("applications", "Applications", "Practical applications and real-world use cases"),
+    ("techniques", "Techniques", "Methods and approaches used"),
+    ("benefits", "Benefits", "Key advantages and positive outcomes"),
+    ("challenges", "Challenges", "Common obstacles and difficulties"),
+)
+
+# Level 2: secondary sub-concepts, grouped under their level 1 parent suffix
+_LEVEL2_TEMPLATES = (
+    ("fundamentals", (
+        ("theory", "Theory", "Theoretical foundations"),
+        ("principles", "Principles", "Guiding principles"),
+        ("history", "History", "Historical development"),
+    )),
+    ("applications", (
+        ("use_cases", "Use Cases", "Specific use case examples"),
+        ("industry", "in Industry", "Industry applications"),
+        ("examples", "Examples", "Practical examples"),
+    )),
+    ("techniques", (
+        ("methods", "Methods", "Specific methodologies"),
+        ("tools", "Tools", "Tools and resources"),
+        ("best_practices", "Best Practices", "Recommended approaches"),
+    )),
+    ("benefits", (
+        ("advantages", "Advantages", "Key advantages"),
+        ("value", "Value Proposition", "Value and impact"),
+    )),
+    ("challenges", (
+        ("limitations", "Limitations", "Known limitations"),
+        ("solutions", "Solutions", "Solutions to challenges"),
+    )),
+)
+
+
+def _topic_concept(concept_id: str, label: str, description: str, abstraction_level: int,
+                   depth_level: int, priority: int, parent_concepts: list[str]) -> dict:
+    """Build a mock topic concept; topic concepts carry no unit or value range."""
+    return {
+        "id": concept_id,
+        "label": label,
+        "description": description,
+        "unit": None,
+        "min_value": None,
+        "max_value": None,
+        "default_value": None,
+        "abstraction_level": abstraction_level,
+        "depth_level": depth_level,
+        "priority": priority,
+        "category": "general",
+        "semantic_type": "entity",
+        "parent_concepts": parent_concepts
+    }
+
+
+def _topic_relationship(source: str, target: str, description: str, coefficient: float) -> dict:
+    """Build a direct relationship between mock topic concepts."""
+    return {
+        "source": source,
+        "target": target,
+        "type": "direct",
+        "description": description,
+        "equation": None,
+        "coefficient": coefficient
+    }
 
 
 def generate_mock_topics(topics: list[str]) -> dict:
@@ -383,176 +680,95 @@ def generate_mock_topics(topics: list[str]) -> dict:
     # Track all concept IDs for cross-referencing
     all_concept_ids = []
 
+    # Normalize each topic to an id once; reused by the cross-topic links below
+    topic_ids = [topic.lower().translate(_ID_TRANS) for topic in topics]
+
     # Create core concepts from topics
-    for i, topic in enumerate(topics):
-        topic_id = topic.lower().replace(" ", "_").replace("-", "_")
-        concepts.append({
-            "id": topic_id,
-            "label": topic,
-            "description": f"Core concept: {topic}",
-            "unit": None,
-            "min_value": None,
-            "max_value": None,
-            "default_value": None,
-            "abstraction_level": 8,
-            "depth_level": 0,
-            "priority": 1,
-            "category": "general",
-            "semantic_type": "entity",
-            "parent_concepts": []
-        })
+    for topic, topic_id in zip(topics, topic_ids):
+        concepts.append(_topic_concept(
+            topic_id, topic, f"Core concept: {topic}",
+            abstraction_level=8, depth_level=0, priority=1,
+            parent_concepts=[]
+        ))
         all_concept_ids.append(topic_id)
 
-        # Level 1: Primary sub-concepts (direct children of topic)
-        level1_concepts = [
-            (f"{topic_id}_fundamentals", f"{topic} Fundamentals", "Core principles and foundational concepts"),
-            (f"{topic_id}_applications", f"{topic} Applications", "Practical applications and real-world use cases"),
-            (f"{topic_id}_techniques", f"{topic} Techniques", "Methods and approaches used"),
-            (f"{topic_id}_benefits", f"{topic} Benefits", "Key advantages and positive outcomes"),
-            (f"{topic_id}_challenges", f"{topic} Challenges", "Common obstacles and difficulties"),
-        ]
-
         level1_ids = []
-        for sub_id, sub_label, sub_desc in level1_concepts:
-            concepts.append({
-                "id": sub_id,
-                "label": sub_label,
-                "description": sub_desc,
-                "unit": None,
-                "min_value": None,
-                "max_value": None,
-                "default_value": None,
-                "abstraction_level": 5,
-                "depth_level": 1,
-                "priority": 2,
-                "category": "general",
-                "semantic_type": "entity",
-                "parent_concepts": [topic_id]
-            })
+        for id_suffix, label_suffix, sub_desc in _LEVEL1_TEMPLATES:
+            sub_id = f"{topic_id}_{id_suffix}"
+            sub_label = f"{topic} {label_suffix}"
+            concepts.append(_topic_concept(
+                sub_id, sub_label, sub_desc,
+                abstraction_level=5, depth_level=1, priority=2,
+                parent_concepts=[topic_id]
+            ))
             all_concept_ids.append(sub_id)
             level1_ids.append(sub_id)
 
             # Create relationship from parent to child
-            relationships.append({
-                "source": topic_id,
-                "target": sub_id,
-                "type": "direct",
-                "description": f"{topic} encompasses {sub_label}",
-                "equation": None,
-                "coefficient": 1.0
-            })
+            relationships.append(_topic_relationship(
+                topic_id, sub_id,
+                f"{topic} encompasses {sub_label}",
+                coefficient=1.0
+            ))
 
         # Level 2: Secondary sub-concepts (children of level 1)
-        level2_map = {
-            f"{topic_id}_fundamentals": [
-                (f"{topic_id}_theory", f"{topic} Theory", "Theoretical foundations"),
-                (f"{topic_id}_principles", f"{topic} Principles", "Guiding principles"),
-                (f"{topic_id}_history", f"{topic} History", "Historical development"),
-            ],
-            f"{topic_id}_applications": [
-                (f"{topic_id}_use_cases", f"{topic} Use Cases", "Specific use case examples"),
-                (f"{topic_id}_industry", f"{topic} in Industry", "Industry applications"),
-                (f"{topic_id}_examples", f"{topic} Examples", "Practical examples"),
-            ],
-            f"{topic_id}_techniques": [
-                (f"{topic_id}_methods", f"{topic} Methods", "Specific methodologies"),
-                (f"{topic_id}_tools", f"{topic} Tools", "Tools and resources"),
-                (f"{topic_id}_best_practices", f"{topic} Best Practices", "Recommended approaches"),
-            ],
-            f"{topic_id}_benefits": [
-                (f"{topic_id}_advantages", f"{topic} Advantages", "Key advantages"),
-                (f"{topic_id}_value", f"{topic} Value Proposition", "Value and impact"),
-            ],
-            f"{topic_id}_challenges": [
-                (f"{topic_id}_limitations", f"{topic} Limitations", "Known limitations"),
-                (f"{topic_id}_solutions", f"{topic} Solutions", "Solutions to challenges"),
-            ],
-        }
-
         level2_ids = []
-        for parent_id, children in level2_map.items():
-            for child_id, child_label, child_desc in children:
-                concepts.append({
-                    "id": child_id,
-                    "label": child_label,
-                    "description": child_desc,
-                    "unit": None,
-                    "min_value": None,
-                    "max_value": None,
-                    "default_value": None,
-                    "abstraction_level": 3,
-                    "depth_level": 2,
-                    "priority": 3,
-                    "category": "general",
-                    "semantic_type": "entity",
-                    "parent_concepts": [parent_id]
-                })
+        for parent_suffix, children in _LEVEL2_TEMPLATES:
+            parent_id = f"{topic_id}_{parent_suffix}"
+            for id_suffix, label_suffix, child_desc in children:
+                child_id = f"{topic_id}_{id_suffix}"
+                child_label = f"{topic} {label_suffix}"
+                concepts.append(_topic_concept(
+                    child_id, child_label, child_desc,
+                    abstraction_level=3, depth_level=2, priority=3,
+                    parent_concepts=[parent_id]
+                ))
                 all_concept_ids.append(child_id)
                 level2_ids.append(child_id)
 
                 # Create relationship from level 1 parent to level 2 child
-                relationships.append({
-                    "source": parent_id,
-                    "target": child_id,
-                    "type": "direct",
-                    "description": f"{parent_id.replace('_', ' ').title()} includes {child_label}",
-                    "equation": None,
-                    "coefficient": 1.0
-                })
+                relationships.append(_topic_relationship(
+                    parent_id, child_id,
+                    f"{parent_id.replace('_', ' ').title()} includes {child_label}",
+                    coefficient=1.0
+                ))
 
         # Cross-connect level 1 concepts (benefits relates to applications, etc.)
         if len(level1_ids) >= 2:
             # Connect benefits to applications
-            relationships.append({
-                "source": f"{topic_id}_benefits",
-                "target": f"{topic_id}_applications",
-                "type": "direct",
-                "description": f"Benefits drive {topic} Applications",
-                "equation": None,
-                "coefficient": 0.7
-            })
+            relationships.append(_topic_relationship(
+                f"{topic_id}_benefits", f"{topic_id}_applications",
+                f"Benefits drive {topic} Applications",
+                coefficient=0.7
+            ))
             # Connect challenges to techniques (techniques solve challenges)
-            relationships.append({
-                "source": f"{topic_id}_techniques",
-                "target": f"{topic_id}_challenges",
-                "type": "direct",
-                "description": f"Techniques address {topic} Challenges",
-                "equation": None,
-                "coefficient": 0.6
-            })
+            relationships.append(_topic_relationship(
+                f"{topic_id}_techniques", f"{topic_id}_challenges",
+                f"Techniques address {topic} Challenges",
+                coefficient=0.6
+            ))
             # Connect fundamentals to techniques
-            relationships.append({
-                "source": f"{topic_id}_fundamentals",
-                "target": f"{topic_id}_techniques",
-                "type": "direct",
-                "description": f"Fundamentals underpin {topic} Techniques",
-                "equation": None,
-                "coefficient": 0.8
-            })
+            relationships.append(_topic_relationship(
+                f"{topic_id}_fundamentals", f"{topic_id}_techniques",
+                f"Fundamentals underpin {topic} Techniques",
+                coefficient=0.8
+            ))
 
     # Connect topics if there are multiple (bidirectional relationships)
     if len(topics) > 1:
-        for i in range(len(topics)):
-            for j in range(i + 1, len(topics)):
-                topic_id_1 = topics[i].lower().replace(" ", "_").replace("-", "_")
-                topic_id_2 = topics[j].lower().replace(" ", "_").replace("-", "_")
-                relationships.append({
-                    "source": topic_id_1,
-                    "target": topic_id_2,
-                    "type": "direct",
-                    "description": f"{topics[i]} relates to {topics[j]}",
-                    "equation": None,
-                    "coefficient": 0.5
-                })
-                # Also connect their sub-concepts
-                relationships.append({
-                    "source": f"{topic_id_1}_applications",
-                    "target": f"{topic_id_2}_applications",
-                    "type": "direct",
-                    "description": f"{topics[i]} Applications connect with {topics[j]} Applications",
-                    "equation": None,
-                    "coefficient": 0.4
-                })
+        pairs = itertools.combinations(zip(topics, topic_ids), 2)
+        for (topic_1, topic_id_1), (topic_2, topic_id_2) in pairs:
+            relationships.append(_topic_relationship(
+                topic_id_1, topic_id_2,
+                f"{topic_1} relates to {topic_2}",
+                coefficient=0.5
+            ))
+            # Also connect their sub-concepts
+            relationships.append(_topic_relationship(
+                f"{topic_id_1}_applications", f"{topic_id_2}_applications",
+                f"{topic_1} Applications connect with {topic_2} Applications",
+                coefficient=0.4
+            ))
 
     return {
         "concepts": concepts,
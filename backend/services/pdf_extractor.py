@@ -1,48 +1,101 @@
 import io
 import re
-from typing import BinaryIO
-import pdfplumber
+from typing import BinaryIO, Iterator
+import pymupdf
+
+# blingfire bundles native libraries for x86_64 only and loads them at
+# import, so other platforms raise OSError rather than ImportError; either
+# way, fall back to the regex splitter
+try:
+    import blingfire
+except (ImportError, OSError):
+    blingfire = None
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# C0/C1 control characters that \s doesn't already cover (\t-\r, \x1c-\x1f
+# and \x85 are whitespace and become spaces instead)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0e-\x1b\x7f-\x84\x86-\x9f]')
+# This handles common cases like "Dr.", "Mr.", etc.
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+def _iter_page_texts(data: bytes) -> Iterator[str]:
+    """Yield the non-empty text of each page of a PDF, in page order."""
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        for page in doc:
+            page_text = page.get_text("text")
+            if page_text:
+                yield page_text
 
 
 def extract_text_from_pdf(file: BinaryIO) -> str:
     """Extract all text from a PDF file."""
-    text_parts = []
-    
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-    
-    return "\n".join(text_parts)
+    return "\n".join(_iter_page_texts(file.read()))
+
+
+def _clean_text(text: str) -> str:
+    """
+    Strip control characters and normalize whitespace. Control characters
+    go first so removing one can't leave a double space behind, which keeps
+    cleaning a page at a time identical to cleaning the joined document.
+    """
+    text = _CONTROL_CHARS_RE.sub('', text)  # Remove control chars
+    text = _WHITESPACE_RE.sub(' ', text)  # Normalize whitespace
+    return text.strip()
+
+
+def _segment(text: str) -> list[str]:
+    """
+    Split cleaned, non-empty text into sentences without filtering, using
+    blingfire's segmenter, or regex if blingfire isn't installed.
+    """
+    if blingfire is not None:
+        # One sentence per line; also handles abbreviations, decimals
+        # and quotes that the regex below splits incorrectly
+        return blingfire.text_to_sentences(text).split("\n")
+
+    # Split on sentence-ending punctuation. Pieces need no further strip():
+    # the text is already stripped and the split consumes the whitespace
+    # between sentences.
+    return _SENTENCE_BOUNDARY_RE.split(text)
 
 
 def split_into_sentences(text: str) -> list[str]:
-    """Split text into sentences using regex."""
-    # Clean up the text
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text) # Remove control chars
-    text = text.strip()
-    
-    # Split on sentence-ending punctuation
-    # This handles common cases like "Dr.", "Mr.", etc.
-    sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])'
-    sentences = re.split(sentence_pattern, text)
-    
-    # Clean and filter sentences
-    clean_sentences = []
-    for s in sentences:
-        s = s.strip()
-        if len(s) > 10:  # Filter out very short fragments
-            clean_sentences.append(s)
-    
-    return clean_sentences
+    """
+    Split text into sentences using blingfire's segmenter, or regex if
+    blingfire isn't installed.
+    """
+    text = _clean_text(text)
+    if not text:
+        return []
+    # Filter out very short fragments
+    return [s for s in _segment(text) if len(s) > 10]
+
+
+def iter_sentences_from_pdf(file: BinaryIO) -> Iterator[str]:
+    """
+    Yield sentences from a PDF page by page, so only one page's text is
+    held at a time instead of the whole document joined into one string.
+    The last sentence of each page is held back and re-split with the next
+    page, so sentences that cross a page break stay whole.
+    """
+    carry = ""
+    for page_text in _iter_page_texts(file.read()):
+        page_text = _clean_text(page_text)
+        if not page_text:
+            continue
+        sentences = _segment(f"{carry} {page_text}" if carry else page_text)
+        carry = sentences.pop()
+        yield from (s for s in sentences if len(s) > 10)
+
+    if len(carry) > 10:
+        yield carry
 
 
 def extract_sentences_from_pdf(file: BinaryIO) -> list[str]:
     """Extract text and split into sentences."""
-    text = extract_text_from_pdf(file)
-    return split_into_sentences(text)
+    return list(iter_sentences_from_pdf(file))
 
 
 def extract_sentences_from_text(text: str) -> list[str]:
@@ -3,39 +3,59 @@ import asyncio
 from database import get_database, connect_to_mongo, close_mongo_connection
 from bson import ObjectId
 
+async def count_and_sample(collection, doc_id, projection, limit=3):
+    """
+    Count a document's items and fetch a few samples in a single
+    aggregation round trip, served from the document_id index that
+    connect_to_mongo ensures.
+    """
+    pipeline = [
+        {"$match": {"document_id": doc_id}},
+        {"$facet": {
+            "count": [{"$count": "n"}],
+            "samples": [{"$limit": limit}, {"$project": projection}],
+        }},
+    ]
+    cursor = collection.aggregate(pipeline, hint="document_id_1")
+    result = await cursor.to_list(length=1)
+    facets = result[0]
+    count = facets["count"][0]["n"] if facets["count"] else 0
+    return count, facets["samples"]
+
 async def verify_latest_document():
     await connect_to_mongo()
     db = get_database()
     
-    # Get latest document
-    cursor = db.documents.find().sort("_id", -1).limit(1)
-    docs = []
-    async for doc in cursor:
-        docs.append(doc)
-        
-    if not docs:
+    # Get latest document (only the fields printed below)
+    latest_doc = await db.documents.find_one(
+        {}, projection={"title": 1, "processed": 1}, sort=[("_id", -1)]
+    )
+
+    if not latest_doc:
         print("No documents found.")
         return
 
-    latest_doc = docs[0]
     doc_id = str(latest_doc["_id"])
     print(f"Latest Document: {latest_doc.get('title', 'Untitled')} ({doc_id})")
     print(f"Processed: {latest_doc.get('processed')}")
     
-    # Count concepts
-    concept_count = await db.concepts.count_documents({"document_id": doc_id})
+    # Count concepts and list a few to see structure
+    concept_count, concepts = await count_and_sample(
+        db.concepts, doc_id, {"label": 1, "id": 1, "_id": 0}
+    )
     print(f"Concepts found in DB: {concept_count}")
     
-    # List a few concepts to see structure
-    async for c in db.concepts.find({"document_id": doc_id}).limit(3):
+    for c in concepts:
         print(f" - Concept: {c.get('label')} (ID: {c.get('id')})") # Check if 'id' field exists or if it's just _id
 
-    # Count relationships
-    rel_count = await db.relationships.count_documents({"document_id": doc_id})
+    # Count relationships and list a few
+    rel_count, rels = await count_and_sample(
+        db.relationships, doc_id,
+        {"source_concept_id": 1, "target_concept_id": 1, "relationship_type": 1, "_id": 0}
+    )
     print(f"Relationships found in DB: {rel_count}")
     
-    # List a few relationships
-    async for r in db.relationships.find({"document_id": doc_id}).limit(3):
+    for r in rels:
         print(f" - Rel: {r.get('source_concept_id')} -> {r.get('target_concept_id')} ({r.get('relationship_type')})")
 
     await close_mongo_connection()